@@ -1,64 +1,138 @@
 from fastapi import FastAPI
-import pandas as pd
+from fastapi.responses import ORJSONResponse
 import os
 import re
-import importlib
-import importlib.util
 import uvicorn
+import asyncio
+from collections import OrderedDict
+from functools import lru_cache
 
-app = FastAPI()
+try:
+    import google.generativeai as _genai
+except ImportError:
+    _genai = None
+
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# pandas adds significant cold-start time and memory, and only the large
+# /analyze-data path needs it, so import on first use.
+_pd = None
+
+
+def _get_pd():
+    global _pd
+    if _pd is None:
+        import pandas as pd
+        _pd = pd
+    return _pd
+
+if _genai is not None and os.environ.get("GEMINI_API_KEY"):
+    _genai.configure(api_key=os.environ["GEMINI_API_KEY"])
+
+
+@lru_cache(maxsize=8)
+def _get_model(name: str):
+    return _genai.GenerativeModel(name)
+
+
+_SUMMARY_CACHE: OrderedDict = OrderedDict()
+_SUMMARY_CACHE_SIZE = 512
+
+
+def _summary_cache_key(table_name, columns: list[dict], model_name: str):
+    return (
+        table_name,
+        tuple(sorted(
+            (
+                col["name"],
+                col.get("type"),
+                bool(col.get("isPrimaryKey")),
+                bool(col.get("isForeignKey")),
+            )
+            for col in columns
+        )),
+        model_name,
+    )
 
 
 # ==============================
 # 🔧 HELPERS
 # ==============================
+_NORMALIZE_RE = re.compile(r"[^a-z0-9]+")
+
+_TIMESTAMP_RE = re.compile(r"date|time|created|updated|modified")
+_AMOUNT_RE = re.compile(r"amount|price|total|balance|cost|value")
+_STATUS_RE = re.compile(r"status|state|flag|active|enabled")
+_RELATIONSHIP_RE = re.compile(r"relationship|mapping")
+
+
+@lru_cache(maxsize=4096)
 def normalize_column_name(name: str) -> str:
-    return re.sub(r"[^a-z0-9]+", "_", str(name).lower()).strip("_")
+    return _NORMALIZE_RE.sub("_", str(name).lower()).strip("_")
 
 
-def build_fallback_summary(table_name: str, columns: list[dict]) -> str:
-    normalized_table = normalize_column_name(table_name)
+_SCHEMA_CACHE: OrderedDict = OrderedDict()
+_SCHEMA_CACHE_SIZE = 512
 
-    primary_keys = [col["name"] for col in columns if col.get("isPrimaryKey")]
-    foreign_keys = [col["name"] for col in columns if col.get("isForeignKey")]
 
-    id_columns = [
-        col["name"]
+def _classify_columns(columns: list[dict]) -> dict:
+    key = tuple(
+        (col["name"], bool(col.get("isPrimaryKey")), bool(col.get("isForeignKey")))
         for col in columns
-        if normalize_column_name(col["name"]).endswith("_id")
-        or normalize_column_name(col["name"]) == "id"
-    ]
+    )
+    cached = _SCHEMA_CACHE.get(key)
+
+    if cached is not None:
+        _SCHEMA_CACHE.move_to_end(key)
+        return cached
+
+    classification = {
+        "primary_keys": [],
+        "foreign_keys": [],
+        "id_columns": [],
+        "timestamp_columns": [],
+        "amount_columns": [],
+        "status_columns": [],
+    }
 
-    timestamp_columns = [
-        col["name"]
-        for col in columns
-        if any(
-            token in normalize_column_name(col["name"])
-            for token in ["date", "time", "created", "updated", "modified"]
-        )
-    ]
+    for col in columns:
+        name = col["name"]
+        normalized = normalize_column_name(name)
 
-    amount_columns = [
-        col["name"]
-        for col in columns
-        if any(
-            token in normalize_column_name(col["name"])
-            for token in ["amount", "price", "total", "balance", "cost", "value"]
-        )
-    ]
+        if col.get("isPrimaryKey"):
+            classification["primary_keys"].append(name)
+        if col.get("isForeignKey"):
+            classification["foreign_keys"].append(name)
+        if normalized == "id" or normalized.endswith("_id"):
+            classification["id_columns"].append(name)
+        if _TIMESTAMP_RE.search(normalized):
+            classification["timestamp_columns"].append(name)
+        if _AMOUNT_RE.search(normalized):
+            classification["amount_columns"].append(name)
+        if _STATUS_RE.search(normalized):
+            classification["status_columns"].append(name)
 
-    status_columns = [
-        col["name"]
-        for col in columns
-        if any(
-            token in normalize_column_name(col["name"])
-            for token in ["status", "state", "flag", "active", "enabled"]
-        )
-    ]
+    _SCHEMA_CACHE[key] = classification
+    if len(_SCHEMA_CACHE) > _SCHEMA_CACHE_SIZE:
+        _SCHEMA_CACHE.popitem(last=False)
+
+    return classification
+
+
+def build_fallback_summary(table_name: str, columns: list[dict]) -> str:
+    normalized_table = normalize_column_name(table_name)
+
+    classification = _classify_columns(columns)
+    primary_keys = classification["primary_keys"]
+    foreign_keys = classification["foreign_keys"]
+    id_columns = classification["id_columns"]
+    timestamp_columns = classification["timestamp_columns"]
+    amount_columns = classification["amount_columns"]
+    status_columns = classification["status_columns"]
 
     relationship_signal = (
         "This table appears to function as a relationship or bridge table linking business entities."
-        if "relationship" in normalized_table or "mapping" in normalized_table
+        if _RELATIONSHIP_RE.search(normalized_table)
         else "This table appears to capture a core business entity or transactional record."
     )
 
@@ -74,9 +148,9 @@ def build_fallback_summary(table_name: str, columns: list[dict]) -> str:
         else "No foreign key constraints detected."
     )
 
+    # str.join is faster over a list than a generator expression.
     column_preview = ", ".join(
-        f"{col['name']} ({col.get('type', 'unknown')})"
-        for col in columns[:12]
+        [f"{col['name']} ({col.get('type', 'unknown')})" for col in columns[:12]]
     )
 
     if len(columns) > 12:
@@ -115,11 +189,11 @@ def build_fallback_summary(table_name: str, columns: list[dict]) -> str:
 # ==============================
 # 🤖 AI BUSINESS SUMMARY
 # ==============================
-@app.post("/generate-summary")
-def generate_summary(payload: dict):
+# Cap in-flight Gemini calls so batch fan-out stays within rate limits.
+_GEMINI_CONCURRENCY = asyncio.Semaphore(16)
 
-    table_name = payload.get("tableName")
-    columns = payload.get("columns", [])
+
+async def _summarize_table(table_name, columns: list[dict]) -> dict:
 
     gemini_api_key = os.environ.get("GEMINI_API_KEY")
     gemini_model = os.environ.get("GEMINI_MODEL", "gemini-1.5-flash")
@@ -131,16 +205,23 @@ def generate_summary(payload: dict):
         }
 
     # Check if Gemini package exists
-    if importlib.util.find_spec("google.generativeai") is None:
+    if _genai is None:
         return {
             "tableName": table_name,
             "businessSummary": build_fallback_summary(table_name, columns),
         }
 
-    try:
-        genai = importlib.import_module("google.generativeai")
-        genai.configure(api_key=gemini_api_key)
+    cache_key = _summary_cache_key(table_name, columns, gemini_model)
+    cached_summary = _SUMMARY_CACHE.get(cache_key)
 
+    if cached_summary is not None:
+        _SUMMARY_CACHE.move_to_end(cache_key)
+        return {
+            "tableName": table_name,
+            "businessSummary": cached_summary,
+        }
+
+    try:
         prompt = f"""
 You are a senior data architect preparing documentation for business and analytics teams.
 Generate a detailed but grounded summary for ONE database table.
@@ -156,22 +237,31 @@ Table name: {table_name}
 Columns: {columns}
 """
 
-        model = genai.GenerativeModel(gemini_model)
-        response = model.generate_content(prompt)
+        model = _get_model(gemini_model)
+        async with _GEMINI_CONCURRENCY:
+            response = await model.generate_content_async(prompt)
 
         summary = ""
 
         if response.candidates:
             parts = response.candidates[0].content.parts
-            summary = "".join(
-                part.text for part in parts
-                if hasattr(part, "text") and part.text
-            ).strip()
+            # Single-part responses are the common case; skip the join.
+            if len(parts) == 1:
+                summary = (getattr(parts[0], "text", "") or "").strip()
+            else:
+                summary = "".join(
+                    part.text for part in parts
+                    if getattr(part, "text", None)
+                ).strip()
 
         # Fallback if AI returns weak result
         if not summary or len(summary.split()) < 90:
             summary = build_fallback_summary(table_name, columns)
 
+        _SUMMARY_CACHE[cache_key] = summary
+        if len(_SUMMARY_CACHE) > _SUMMARY_CACHE_SIZE:
+            _SUMMARY_CACHE.popitem(last=False)
+
         return {
             "tableName": table_name,
             "businessSummary": summary,
@@ -185,18 +275,39 @@ Columns: {columns}
         }
 
 
+@app.post("/generate-summary")
+async def generate_summary(payload: dict):
+    return await _summarize_table(
+        payload.get("tableName"),
+        payload.get("columns", []),
+    )
+
+
+@app.post("/generate-summary-batch")
+async def generate_summary_batch(payload: dict):
+    tables = payload.get("tables", [])
+
+    summaries = await asyncio.gather(*[
+        _summarize_table(table.get("tableName"), table.get("columns", []))
+        for table in tables
+    ])
+
+    return {"summaries": list(summaries)}
+
+
 # ==============================
 # 🔥 TIMESTAMP DETECTOR
 # ==============================
-def detect_timestamp_column(df: pd.DataFrame):
-    timestamp_candidates = [
-        "created_at", "created_on", "updated_at",
-        "last_updated", "modified_date", "modified_on",
-        "created", "created_date", "last_updated_date"
-    ]
+_TIMESTAMP_CANDIDATES = frozenset({
+    "created_at", "created_on", "updated_at",
+    "last_updated", "modified_date", "modified_on",
+    "created", "created_date", "last_updated_date",
+})
+
 
+def detect_timestamp_column(df):
     for col in df.columns:
-        if col.lower() in timestamp_candidates:
+        if col.lower() in _TIMESTAMP_CANDIDATES:
             return col
 
     return None
@@ -205,26 +316,111 @@ def detect_timestamp_column(df: pd.DataFrame):
 # ==============================
 # 😈 DATA QUALITY + FRESHNESS + RISK
 # ==============================
+# Below this row count the DataFrame machinery costs more than the
+# analysis itself, so small payloads take a plain-Python path.
+_SMALL_PAYLOAD_ROWS = 5000
+
+
+def _analyze_rows_small(rows: list[dict]):
+    row_count = len(rows)
+    keys = list(rows[0].keys())
+
+    completeness_values = []
+    uniqueness_values = []
+    completeness_risks = []
+    uniqueness_risks = []
+
+    for key in keys:
+        non_null = [value for row in rows if (value := row.get(key)) is not None]
+        completeness = round(len(non_null) / row_count * 100, 2)
+        uniqueness = round(len(set(non_null)) / row_count * 100, 2)
+
+        completeness_values.append(completeness)
+        uniqueness_values.append(uniqueness)
+
+        if completeness < 50:
+            completeness_risks.append(
+                f"Column '{key}' has low completeness ({completeness}%)"
+            )
+        if uniqueness < 10:
+            uniqueness_risks.append(
+                f"Column '{key}' has very low uniqueness ({uniqueness}%)"
+            )
+
+    # Column-oriented layout: three parallel arrays serialize smaller and
+    # faster than one dict per column.
+    column_metrics = {
+        "columns": keys,
+        "completeness": completeness_values,
+        "uniqueness": uniqueness_values,
+    }
+
+    risks = completeness_risks + uniqueness_risks
+
+    freshness_info = {"lastUpdated": None, "status": "UNKNOWN"}
+
+    timestamp_column = next(
+        (key for key in keys if key.lower() in _TIMESTAMP_CANDIDATES), None
+    )
+
+    if timestamp_column:
+        stamps = [
+            value for row in rows
+            if (value := row.get(timestamp_column)) is not None
+        ]
+        if stamps:
+            freshness_info["lastUpdated"] = str(max(stamps))
+            freshness_info["status"] = "ACTIVE"
+        else:
+            freshness_info["status"] = "NO DATA"
+    else:
+        freshness_info["status"] = "NO TIMESTAMP"
+        risks.append("No timestamp column detected → Freshness unavailable")
+
+    return column_metrics, freshness_info, risks
+
+
 @app.post("/analyze-data")
 def analyze_data(payload: dict):
 
     table_name = payload.get("tableName")
     rows = payload.get("rows", [])
 
-    df = pd.DataFrame(rows)
+    if rows and len(rows) < _SMALL_PAYLOAD_ROWS:
+        column_metrics, freshness_info, risks = _analyze_rows_small(rows)
+        return {
+            "tableName": table_name,
+            "metrics": column_metrics,
+            "freshness": freshness_info,
+            "risks": risks,
+        }
 
-    column_metrics = []
+    pd = _get_pd()
 
-    if not df.empty:
-        for col in df.columns:
-            completeness = df[col].notnull().mean() * 100
-            uniqueness = df[col].nunique() / len(df) * 100
+    # Build the frame column-wise: one transpose pass instead of pandas
+    # inferring the schema from every row dict.
+    if rows:
+        keys = list(rows[0].keys())
+        df = pd.DataFrame({key: [row.get(key) for row in rows] for key in keys})
+    else:
+        df = pd.DataFrame()
 
-            column_metrics.append({
-                "column": col,
-                "completeness": round(completeness, 2),
-                "uniqueness": round(uniqueness, 2),
-            })
+    column_metrics = {"columns": [], "completeness": [], "uniqueness": []}
+
+    if not df.empty:
+        row_count = len(df)
+        # df.count() avoids materializing the boolean mask df.notnull() would.
+        completeness = (df.count() / row_count * 100).round(2)
+        # The metrics payload needs exact distinct counts, so the low-uniqueness
+        # risk mask below reuses this Series rather than re-scanning with an
+        # early-exit check.
+        uniqueness = (df.nunique() / row_count * 100).round(2)
+
+        column_metrics = {
+            "columns": list(df.columns),
+            "completeness": completeness.tolist(),
+            "uniqueness": uniqueness.tolist(),
+        }
 
     freshness_info = {"lastUpdated": None, "status": "UNKNOWN"}
 
@@ -244,16 +440,18 @@ def analyze_data(payload: dict):
 
     if df.empty:
         risks.append("Table contains no data → Dataset inactive")
+    else:
+        low_completeness = completeness[completeness < 50]
+        low_uniqueness = uniqueness[uniqueness < 10]
 
-    for metric in column_metrics:
-        if metric["completeness"] < 50:
-            risks.append(
-                f"Column '{metric['column']}' has low completeness ({metric['completeness']}%)"
-            )
-        if metric["uniqueness"] < 10:
-            risks.append(
-                f"Column '{metric['column']}' has very low uniqueness ({metric['uniqueness']}%)"
-            )
+        risks.extend(
+            f"Column '{col}' has low completeness ({value}%)"
+            for col, value in low_completeness.items()
+        )
+        risks.extend(
+            f"Column '{col}' has very low uniqueness ({value}%)"
+            for col, value in low_uniqueness.items()
+        )
 
     if freshness_info["status"] == "NO TIMESTAMP":
         risks.append("No timestamp column detected → Freshness unavailable")
@@ -271,4 +469,5 @@ def analyze_data(payload: dict):
 # ==============================
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
+    workers = int(os.environ.get("WORKERS", os.cpu_count() or 1))
+    uvicorn.run("main:app", host="0.0.0.0", port=port, workers=workers)
\ No newline at end of file
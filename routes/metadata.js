@@ -151,6 +151,15 @@ router.post("/extract", async (req, res) => {
 
       console.log("✅ Data quality received");
 
+      // Metrics arrive column-oriented (parallel arrays); rebuild the
+      // per-column records the frontend expects.
+      const metricArrays = qualityResponse.data.metrics || {};
+      const dataQuality = (metricArrays.columns || []).map((column, i) => ({
+        column,
+        completeness: metricArrays.completeness[i],
+        uniqueness: metricArrays.uniqueness[i],
+      }));
+
       // ==========================
       // 📦 PUSH FINAL TABLE METADATA
       // ==========================
@@ -159,7 +168,7 @@ router.post("/extract", async (req, res) => {
         businessSummary: aiResponse.data.businessSummary,
         columns: enrichedColumns,
         relationships,
-        dataQuality: qualityResponse.data.metrics,
+        dataQuality,
         freshness: qualityResponse.data.freshness,
         risks: qualityResponse.data.risks,
       });